@@ -1,16 +1,24 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import WriteConcern
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import uuid
-from datetime import datetime
+import hashlib
+from datetime import datetime, timezone
 import aiohttp
+import orjson
 import asyncio
+import time
+import math
+import numpy as np
 
 # AI agents
 from ai_agents.agents import AgentConfig, SearchAgent, ChatAgent
@@ -21,16 +29,54 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=200,
+    minPoolSize=20,
+    maxIdleTimeMS=60_000,
+    serverSelectionTimeoutMS=3000,
+    compressors="zlib",
+)
 db = client[os.environ['DB_NAME']]
 
+# Status check write batching
+STATUS_BATCH_MAX_SIZE = 200
+STATUS_BATCH_MAX_WAIT_SECONDS = 0.01
+STATUS_QUEUE_MAX_SIZE = 10_000
+status_queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=STATUS_QUEUE_MAX_SIZE)
+status_writer_task: Optional[asyncio.Task] = None
+db_setup_task: Optional[asyncio.Task] = None
+
 # AI agents init
 agent_config = AgentConfig()
 search_agent: Optional[SearchAgent] = None
 chat_agent: Optional[ChatAgent] = None
+search_agent_capabilities: List[str] = []
+chat_agent_capabilities: List[str] = []
+search_agent_error: Optional[str] = None
+chat_agent_error: Optional[str] = None
+search_agent_failed_at: Optional[float] = None
+chat_agent_failed_at: Optional[float] = None
+AGENT_RETRY_COOLDOWN_SECONDS = 30.0
 
 # Main app
-app = FastAPI(title="AI Agents API", description="Minimal AI Agents API with LangGraph and MCP support")
+app = FastAPI(
+    title="AI Agents API",
+    description="Minimal AI Agents API with LangGraph and MCP support",
+    default_response_class=ORJSONResponse,
+)
+
+# Public API without cookies, so wildcard CORS is sent verbatim and preflights are cached
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["*"],
+    allow_headers=["*"],
+    max_age=86400,
+)
+
+# Compress larger responses such as the funding arbitrage market list
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # API router
 api_router = APIRouter(prefix="/api")
@@ -40,7 +86,7 @@ api_router = APIRouter(prefix="/api")
 class StatusCheck(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     client_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class StatusCheckCreate(BaseModel):
     client_name: str
@@ -92,67 +138,268 @@ class FundingArbitrageResponse(BaseModel):
     markets: List[MarketData]
     total_markets: int
     filtered_markets: int
-    highest_funding_rate: Optional[MarketData] = None
+    # Index into markets of the highest funding rate, None when markets is empty
+    highest_funding_rate_index: Optional[int] = None
     last_updated: datetime
     error: Optional[str] = None
 
+# Minimum USD value of open interest for a market to be listed
+MIN_USD_OPEN_INTEREST = 50_000_000  # $50M USD
+
+# Hyperliquid response cache
+MARKET_CACHE_TTL_SECONDS = 2.0
+_market_cache = {"ts": 0.0, "data": None}  # data: (markets, total_markets, etag, fetched_at)
+_market_refresh_task: Optional[asyncio.Task] = None
+
+
+# Hyperliquid request, pre-encoded once
+HYPERLIQUID_INFO_URL = "https://api.hyperliquid.xyz/info"
+HYPERLIQUID_META_BODY = orjson.dumps({"type": "metaAndAssetCtxs"})
+HYPERLIQUID_HEADERS = {"Content-Type": "application/json"}
+
+
 # Hyperliquid API functions
 async def fetch_hyperliquid_data():
     """Fetch market data from Hyperliquid API"""
-    url = "https://api.hyperliquid.xyz/info"
-    payload = {"type": "metaAndAssetCtxs"}
+    # Shared session keeps the upstream connection alive between requests
+    session: aiohttp.ClientSession = app.state.http_session
+    async with session.post(HYPERLIQUID_INFO_URL, data=HYPERLIQUID_META_BODY, headers=HYPERLIQUID_HEADERS) as response:
+        if response.status == 200:
+            data = orjson.loads(await response.read())
+            return data
+        else:
+            raise HTTPException(status_code=500, detail=f"Failed to fetch Hyperliquid data: {response.status}")
+
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, json=payload) as response:
-            if response.status == 200:
-                data = await response.json()
-                return data
-            else:
-                raise HTTPException(status_code=500, detail=f"Failed to fetch Hyperliquid data: {response.status}")
+def _safe_float(value) -> float:
+    """Convert a Hyperliquid numeric string to float, NaN if malformed"""
+    try:
+        return float(value or "0")
+    except (ValueError, TypeError):
+        return math.nan
+
+
+# Hyperliquid asset context fields, in column order
+_MARKET_FIELDS = ("markPx", "funding", "openInterest", "premium", "dayNtlVlm", "prevDayPx")
 
 
-def parse_market_data(hyperliquid_data) -> List[MarketData]:
-    """Parse Hyperliquid API response into MarketData objects"""
-    markets = []
+def _market_table(asset_contexts) -> np.ndarray:
+    """Extract the numeric market fields into an (n, 6) float64 table"""
+    rows = [
+        tuple(asset_ctx.get(key, "0") or "0" for key in _MARKET_FIELDS)
+        for asset_ctx in asset_contexts
+    ]
+    if not rows:
+        return np.empty((0, len(_MARKET_FIELDS)), dtype=np.float64)
+    try:
+        # NumPy parses the whole table of numeric strings in C
+        return np.array(rows, dtype=np.float64)
+    except (ValueError, TypeError):
+        # Fall back per value so one malformed asset doesn't drop the rest
+        return np.array([[_safe_float(value) for value in row] for row in rows], dtype=np.float64)
+
 
+def _rank_markets(table: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Numeric kernel over the market table
+    Returns (valid mask, indices of qualifying markets sorted by funding rate, their 24h price change)
+    """
+    mark_px = table[:, 0]
+    funding = table[:, 1]
+    oi = table[:, 2]
+    prev = table[:, 5]
+
+    # Drop assets with malformed numbers
+    valid = np.isfinite(table).all(axis=1)
+
+    # Filter for USD value of open interest > $50M, sort by funding rate (highest first)
+    usd_oi = oi * mark_px
+    idx = np.flatnonzero(valid & (usd_oi > MIN_USD_OPEN_INTEREST))
+    idx = idx[np.argsort(-funding[idx], kind="stable")]
+
+    # Calculate 24h price change for the survivors only
+    sel_mark = mark_px[idx]
+    sel_prev = prev[idx]
+    price_change_24h = np.zeros(len(idx), dtype=np.float64)
+    has_prev = (sel_prev > 0) & (sel_mark > 0)
+    price_change_24h[has_prev] = (sel_mark[has_prev] - sel_prev[has_prev]) / sel_prev[has_prev] * 100
+
+    return valid, idx, price_change_24h
+
+
+def parse_market_data(hyperliquid_data) -> Tuple[List[MarketData], int]:
+    """
+    Parse Hyperliquid API response into MarketData objects
+    Returns markets with >$50M USD open interest sorted by funding rate (highest first),
+    along with the total number of markets parsed
+    """
     if not hyperliquid_data or len(hyperliquid_data) < 2:
-        return markets
+        return [], 0
 
     universe = hyperliquid_data[0].get("universe", [])
     asset_contexts = hyperliquid_data[1] if len(hyperliquid_data) > 1 else []
 
-    for i, asset_ctx in enumerate(asset_contexts):
-        if i < len(universe):
-            symbol = universe[i]["name"]
-
-            try:
-                # Parse market data with safe float conversion
-                mark_price = float(asset_ctx.get("markPx") or "0")
-                funding_rate = float(asset_ctx.get("funding") or "0")
-                open_interest = float(asset_ctx.get("openInterest") or "0")
-                premium = float(asset_ctx.get("premium") or "0")
-                day_volume = float(asset_ctx.get("dayNtlVlm") or "0")
-                prev_day_price = float(asset_ctx.get("prevDayPx") or "0")
-
-                # Calculate 24h price change
-                price_change_24h = 0.0
-                if prev_day_price > 0 and mark_price > 0:
-                    price_change_24h = ((mark_price - prev_day_price) / prev_day_price) * 100
-
-                markets.append(MarketData(
-                    symbol=symbol,
-                    mark_price=mark_price,
-                    funding_rate=funding_rate,
-                    open_interest=open_interest,
-                    premium=premium,
-                    day_volume=day_volume,
-                    price_change_24h=price_change_24h
-                ))
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Error parsing data for {symbol}: {e}")
-                continue
-
-    return markets
+    n = min(len(universe), len(asset_contexts))
+    symbols = [universe[i]["name"] for i in range(n)]
+
+    table = _market_table(asset_contexts[:n])
+    valid, idx, price_change_24h = _rank_markets(table)
+
+    for i in np.flatnonzero(~valid):
+        logger.warning(f"Error parsing data for {symbols[i]}: malformed numeric field")
+
+    # Values are already clean floats, so skip per-field validation
+    markets = [
+        MarketData.model_construct(
+            symbol=symbols[i],
+            mark_price=mp,
+            funding_rate=fr,
+            open_interest=oi,
+            premium=pr,
+            day_volume=dv,
+            price_change_24h=pc
+        )
+        for i, (mp, fr, oi, pr, dv, _), pc in zip(
+            idx.tolist(),
+            table[idx].tolist(),
+            price_change_24h.tolist(),
+        )
+    ]
+
+    return markets, int(valid.sum())
+
+
+def build_market_snapshot(hyperliquid_data) -> Tuple[List[MarketData], int, str]:
+    """Parse Hyperliquid data and tag the result with an ETag of the market contents"""
+    markets, total_markets = parse_market_data(hyperliquid_data)
+    payload = orjson.dumps([total_markets, [market.__dict__ for market in markets]])
+    # Weak tag: gzip and identity encodings of the same markets share it
+    etag = f'W/"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+    return markets, total_markets, etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak If-None-Match comparison, ignoring W/ prefixes and honouring *"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(","))
+
+
+async def refresh_markets() -> Tuple[List[MarketData], int, str, datetime]:
+    """Fetch and parse Hyperliquid markets into the cache"""
+    global _market_refresh_task
+    try:
+        hyperliquid_data = await fetch_hyperliquid_data()
+        fetched_at = datetime.now(timezone.utc)
+        # Parse, filter, sort and hash off the event loop
+        markets, total_markets, etag = await asyncio.to_thread(build_market_snapshot, hyperliquid_data)
+        parsed = (markets, total_markets, etag, fetched_at)
+
+        _market_cache["data"] = parsed
+        _market_cache["ts"] = time.monotonic()
+        return parsed
+    finally:
+        _market_refresh_task = None
+
+
+async def get_cached_markets() -> Tuple[List[MarketData], int, str, datetime]:
+    """Return filtered Hyperliquid markets, total count, ETag and fetch time, refreshing at most once per TTL window"""
+    global _market_refresh_task
+    if _market_cache["data"] is not None and time.monotonic() - _market_cache["ts"] < MARKET_CACHE_TTL_SECONDS:
+        return _market_cache["data"]
+
+    # Single-flight: concurrent callers share one in-progress refresh
+    if _market_refresh_task is None:
+        _market_refresh_task = asyncio.create_task(refresh_markets())
+
+    # Shield so a disconnecting caller doesn't cancel the shared refresh
+    return await asyncio.shield(_market_refresh_task)
+
+
+async def flush_status_batch(batch: List[dict]):
+    """Write a batch of status checks with unacknowledged write concern"""
+    collection = db.status_checks.with_options(write_concern=WriteConcern(w=0))
+    try:
+        await collection.insert_many(batch, ordered=False)
+    except Exception as e:
+        logger.error(f"Error writing {len(batch)} status checks: {e}")
+
+
+async def status_writer():
+    """Drain queued status checks into micro-batched inserts"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await status_queue.get()]
+        try:
+            deadline = loop.time() + STATUS_BATCH_MAX_WAIT_SECONDS
+
+            while len(batch) < STATUS_BATCH_MAX_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(status_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await flush_status_batch(batch)
+        except asyncio.CancelledError:
+            # Shutting down: write the batch already taken off the queue
+            await flush_status_batch(batch)
+            raise
+
+
+async def prepare_database():
+    """Warm up the MongoDB connection pool and create indexes"""
+    try:
+        await db.command("ping")
+    except Exception as e:
+        logger.error(f"MongoDB ping failed, skipping index creation: {e}")
+        return
+
+    # Index for newest-first status check reads (idempotent)
+    try:
+        await db.status_checks.create_index([("timestamp", -1)])
+    except Exception as e:
+        logger.error(f"Failed to create status_checks index: {e}")
+
+
+def _agent_retry_due(failed_at: Optional[float]) -> bool:
+    """Whether a failed agent may be rebuilt yet"""
+    return failed_at is None or time.monotonic() - failed_at >= AGENT_RETRY_COOLDOWN_SECONDS
+
+
+def ensure_search_agent() -> Optional[SearchAgent]:
+    """Build the search agent if missing, retrying at most once per cooldown after a failure"""
+    global search_agent, search_agent_capabilities, search_agent_error, search_agent_failed_at
+    if search_agent is None and _agent_retry_due(search_agent_failed_at):
+        try:
+            search_agent = SearchAgent(agent_config)
+            search_agent_capabilities = search_agent.get_capabilities()
+            search_agent_error = None
+        except Exception as e:
+            search_agent_error = str(e)
+            search_agent_failed_at = time.monotonic()
+            logger.error(f"Failed to initialize search agent: {e}")
+    return search_agent
+
+
+def ensure_chat_agent() -> Optional[ChatAgent]:
+    """Build the chat agent if missing, retrying at most once per cooldown after a failure"""
+    global chat_agent, chat_agent_capabilities, chat_agent_error, chat_agent_failed_at
+    if chat_agent is None and _agent_retry_due(chat_agent_failed_at):
+        try:
+            chat_agent = ChatAgent(agent_config)
+            chat_agent_capabilities = chat_agent.get_capabilities()
+            chat_agent_error = None
+        except Exception as e:
+            chat_agent_error = str(e)
+            chat_agent_failed_at = time.monotonic()
+            logger.error(f"Failed to initialize chat agent: {e}")
+    return chat_agent
 
 
 # Routes
@@ -162,36 +409,34 @@ async def root():
 
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    now = datetime.now(timezone.utc)
+    status_obj = StatusCheck.model_construct(client_name=input.client_name, timestamp=now)
+    # Persisted asynchronously by the batched status writer (copy, insert_many adds _id)
+    try:
+        status_queue.put_nowait(status_obj.__dict__.copy())
+    except asyncio.QueueFull:
+        # Writer is falling behind (e.g. MongoDB unreachable), reject rather than buffer without bound
+        logger.warning(f"Status check queue full, rejecting status check for {input.client_name}")
+        raise HTTPException(status_code=503, detail="Status check queue is full, try again later")
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
 async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+    cursor = db.status_checks.find({}, projection={"_id": 0}).sort("timestamp", -1).limit(1000)
+    return [StatusCheck.model_construct(**status_check) async for status_check in cursor]
 
 
 # AI agent routes
 @api_router.post("/chat", response_model=ChatResponse)
 async def chat_with_agent(request: ChatRequest):
     # Chat with AI agent
-    global search_agent, chat_agent
-    
     try:
-        # Init agents if needed
-        if request.agent_type == "search" and search_agent is None:
-            search_agent = SearchAgent(agent_config)
-            
-        elif request.agent_type == "chat" and chat_agent is None:
-            chat_agent = ChatAgent(agent_config)
-        
-        # Select agent
-        agent = search_agent if request.agent_type == "search" else chat_agent
+        # Select agent, retrying construction if startup init failed
+        agent = ensure_search_agent() if request.agent_type == "search" else ensure_chat_agent()
         
         if agent is None:
-            raise HTTPException(status_code=500, detail="Failed to initialize agent")
+            agent_error = search_agent_error if request.agent_type == "search" else chat_agent_error
+            raise HTTPException(status_code=500, detail=f"Failed to initialize agent: {agent_error}")
         
         # Execute agent
         response = await agent.execute(request.message)
@@ -200,7 +445,7 @@ async def chat_with_agent(request: ChatRequest):
             success=response.success,
             response=response.content,
             agent_type=request.agent_type,
-            capabilities=agent.get_capabilities(),
+            capabilities=search_agent_capabilities if request.agent_type == "search" else chat_agent_capabilities,
             metadata=response.metadata,
             error=response.error
         )
@@ -219,12 +464,10 @@ async def chat_with_agent(request: ChatRequest):
 @api_router.post("/search", response_model=SearchResponse)
 async def search_and_summarize(request: SearchRequest):
     # Web search with AI summary
-    global search_agent
-    
     try:
-        # Init search agent if needed
-        if search_agent is None:
-            search_agent = SearchAgent(agent_config)
+        # Retry construction if startup init failed
+        if ensure_search_agent() is None:
+            raise HTTPException(status_code=500, detail=f"Failed to initialize agent: {search_agent_error}")
         
         # Search with agent
         search_prompt = f"Search for information about: {request.query}. Provide a comprehensive summary with key findings."
@@ -259,50 +502,47 @@ async def search_and_summarize(request: SearchRequest):
 
 
 @api_router.get("/funding-arbitrage", response_model=FundingArbitrageResponse)
-async def get_funding_arbitrage():
+async def get_funding_arbitrage(request: Request, response: Response):
     """
     Get funding arbitrage opportunities from Hyperliquid
     Filters for markets with >$50M USD open interest and sorts by funding rate
+    Returns 304 when the client's If-None-Match ETag matches the current markets
     """
     try:
-        # Fetch data from Hyperliquid
-        hyperliquid_data = await fetch_hyperliquid_data()
-
-        # Parse market data
-        all_markets = parse_market_data(hyperliquid_data)
+        # Fetch and parse data from Hyperliquid (cached for a short TTL)
+        # Markets come back already filtered and sorted
+        filtered_markets, total_markets, etag, fetched_at = await get_cached_markets()
 
-        # Filter for USD value of open interest > $50M
-        MIN_USD_OPEN_INTEREST = 50_000_000  # $50M USD
-        filtered_markets = [
-            market for market in all_markets
-            if (market.open_interest * market.mark_price) > MIN_USD_OPEN_INTEREST
-        ]
+        # Short-circuit polling clients whose copy is unchanged
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
 
-        # Sort by funding rate (highest first)
-        filtered_markets.sort(key=lambda x: x.funding_rate, reverse=True)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
 
-        # Find highest funding rate
-        highest_funding = filtered_markets[0] if filtered_markets else None
+        # Markets are sorted, so the highest funding rate is always first
+        highest_funding_index = 0 if filtered_markets else None
 
-        logger.info(f"Found {len(filtered_markets)} markets with >$50M USD open interest out of {len(all_markets)} total")
+        logger.info(f"Found {len(filtered_markets)} markets with >$50M USD open interest out of {total_markets} total")
 
         return FundingArbitrageResponse(
             success=True,
             markets=filtered_markets,
-            total_markets=len(all_markets),
+            total_markets=total_markets,
             filtered_markets=len(filtered_markets),
-            highest_funding_rate=highest_funding,
-            last_updated=datetime.utcnow()
+            highest_funding_rate_index=highest_funding_index,
+            last_updated=fetched_at
         )
 
     except Exception as e:
         logger.error(f"Error fetching funding arbitrage data: {e}")
+        now = datetime.now(timezone.utc)
         return FundingArbitrageResponse(
             success=False,
             markets=[],
             total_markets=0,
             filtered_markets=0,
-            last_updated=datetime.utcnow(),
+            last_updated=now,
             error=str(e)
         )
 
@@ -311,9 +551,15 @@ async def get_funding_arbitrage():
 async def get_agent_capabilities():
     # Get agent capabilities
     try:
+        # Served from startup state; agents are only rebuilt by the routes that use them
+        if search_agent is None:
+            raise RuntimeError(f"Failed to initialize search agent: {search_agent_error}")
+        if chat_agent is None:
+            raise RuntimeError(f"Failed to initialize chat agent: {chat_agent_error}")
+
         capabilities = {
-            "search_agent": SearchAgent(agent_config).get_capabilities(),
-            "chat_agent": ChatAgent(agent_config).get_capabilities()
+            "search_agent": search_agent_capabilities,
+            "chat_agent": chat_agent_capabilities
         }
         return {
             "success": True,
@@ -329,14 +575,6 @@ async def get_agent_capabilities():
 # Include router
 app.include_router(api_router)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 # Logging config
 logging.basicConfig(
     level=logging.INFO,
@@ -347,10 +585,25 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     # Initialize agents on startup
-    global search_agent, chat_agent
+    global status_writer_task, db_setup_task
     logger.info("Starting AI Agents API...")
-    
-    # Lazy agent init for faster startup
+
+    # Long-lived HTTP session for upstream calls
+    app.state.http_session = aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=10),
+        connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=60),
+    )
+
+    # Warm up MongoDB in the background so an unreachable server doesn't delay startup
+    db_setup_task = asyncio.create_task(prepare_database())
+
+    # Background writer for batched status checks
+    status_writer_task = asyncio.create_task(status_writer())
+
+    # Eager agent init so first requests don't pay construction cost
+    ensure_search_agent()
+    ensure_chat_agent()
+
     logger.info("AI Agents API ready!")
 
 
@@ -363,6 +616,29 @@ async def shutdown_db_client():
     if search_agent and search_agent.mcp_client:
         # MCP cleanup automatic
         pass
+
+    # Stop database warm-up if it is still waiting on MongoDB
+    if db_setup_task is not None and not db_setup_task.done():
+        db_setup_task.cancel()
+
+    # Stop status writer and flush anything still queued
+    if status_writer_task is not None:
+        status_writer_task.cancel()
+        try:
+            await status_writer_task
+        except asyncio.CancelledError:
+            pass
+
+    pending = []
+    while not status_queue.empty():
+        pending.append(status_queue.get_nowait())
+    if pending:
+        await flush_status_batch(pending)
+
+    # Close shared HTTP session
+    http_session = getattr(app.state, "http_session", None)
+    if http_session is not None:
+        await http_session.close()
     
     client.close()
     logger.info("AI Agents API shutdown complete.")
@@ -94,6 +94,37 @@ def test_server_endpoints():
         print(f"❌ Capabilities endpoint failed: {e}")
         return False
     
+    # Funding arbitrage endpoint test
+    print("\n5️⃣ Testing funding arbitrage endpoint...")
+    try:
+        response = requests.get(f"{base_url}/funding-arbitrage")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        
+        data = response.json()
+        assert data["success"] is True, f"Funding arbitrage failed: {data.get('error')}"
+        assert data["filtered_markets"] == len(data["markets"])
+        
+        # Highest funding market is referenced by index into markets
+        index = data["highest_funding_rate_index"]
+        if data["markets"]:
+            highest = data["markets"][index]
+            max_rate = max(market["funding_rate"] for market in data["markets"])
+            assert highest["funding_rate"] == max_rate, f"Index {index} is not the highest funding rate"
+        else:
+            assert index is None, f"Expected no index for empty markets, got {index}"
+        
+        # Unchanged data must short-circuit with 304
+        etag = response.headers.get("ETag")
+        assert etag, "Missing ETag header"
+        response = requests.get(f"{base_url}/funding-arbitrage", headers={"If-None-Match": etag})
+        assert response.status_code == 304, f"Expected 304, got {response.status_code}"
+        
+        print("✅ Funding arbitrage endpoint working")
+        print(f"   Markets: {data['filtered_markets']} of {data['total_markets']}")
+    except Exception as e:
+        print(f"❌ Funding arbitrage endpoint failed: {e}")
+        return False
+    
     return True
 
 
@@ -115,7 +146,7 @@ def main():
     if not check_server_running():
         print("❌ Server not running on http://localhost:8000")
         print("💡 Start the server first:")
-        print("   cd backend && uvicorn server:app --reload")
+        print("   cd backend && uvicorn server:app --reload --loop uvloop --http httptools")
         return False
     
     print("✅ Server is running")
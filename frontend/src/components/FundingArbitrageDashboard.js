@@ -71,6 +71,11 @@ const FundingArbitrageDashboard = () => {
     return 'secondary';
   };
 
+  // Highest funding market is referenced by index into markets
+  const highestFunding = data?.highest_funding_rate_index != null
+    ? data.markets[data.highest_funding_rate_index]
+    : null;
+
   if (loading && !data) {
     return (
       <div className="min-h-screen bg-gradient-to-br from-slate-900 via-purple-900 to-slate-900 p-8">
@@ -192,10 +197,10 @@ const FundingArbitrageDashboard = () => {
             </CardHeader>
             <CardContent>
               <div className="text-2xl font-bold text-green-400">
-                {data?.highest_funding_rate ? formatPercent(data.highest_funding_rate.funding_rate) : 'N/A'}
+                {highestFunding ? formatPercent(highestFunding.funding_rate) : 'N/A'}
               </div>
               <p className="text-xs text-slate-400 mt-1">
-                {data?.highest_funding_rate?.symbol || 'No data'}
+                {highestFunding?.symbol || 'No data'}
               </p>
             </CardContent>
           </Card>